@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+Auto-Fix Benchmarks
+===================
+Micro-benchmarks for scripts/auto-fix-issues.py on synthetic inputs.
+
+Usage:
+    python scripts/bench-auto-fix.py classifier [--issues 10000] [--body-words 600] [--combined]
+    python scripts/bench-auto-fix.py jsdoc [--lines 50000]
+    python scripts/bench-auto-fix.py e2e [--sizes 30,300,3000] [--issues N] [--workers 1] [--async]
+    python scripts/bench-auto-fix.py extract [--files 20000] [--workers 1,2,4]
+    python scripts/bench-auto-fix.py throttle [--reads 300] [--writes 30] [--threads 16]
+
+The e2e benchmark builds a synthetic Next.js tree and a bare local remote
+per size, serves generated issues from scripts/fake-github.py and runs
+auto-fix-issues.py end to end, reporting wall time, subprocesses, peak
+RSS, API calls and PRs opened.
+
+The throttle benchmark fires a mixed read/write load at a fake API with
+secondary limits switched on, once with bare requests and once through
+GitHubClient's scheduler, and compares failures, throttled responses and
+read/write latency.
+
+Author: vanshaj2023
+"""
+
+import argparse
+import importlib.util
+import statistics
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_auto_fix():
+    """Import auto-fix-issues.py (its file name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location(
+        "auto_fix_issues", os.path.join(SCRIPT_DIR, "auto-fix-issues.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["auto_fix_issues"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+# ── Classifier ───────────────────────────────────────────────────────────────
+
+FakeIssue = namedtuple("FakeIssue", ["number", "title", "body"])
+
+FILLER_WORDS = (
+    "the app crashes when users open the dashboard after login and the research "
+    "panel keeps spinning forever while the api route returns a blank response "
+    "we tried clearing the browser storage and restarting the server without luck "
+    "steps to reproduce open settings switch model run a search wait for results"
+).split()
+
+TRIGGER_PHRASES = [
+    "TypeScript error TS2345 in the planner",
+    "Cannot find module '@/lib/cache'",
+    "unused variable in research-panel",
+    "missing environment variable MONGODB_URI",
+    "README is out of date",
+    "outdated dependency with a known vulnerability",
+    "unhandled error in the enrich route, needs try/catch",
+    "missing alt text for screen reader users",
+]
+
+
+def synthetic_issues(count, body_words, seed=0):
+    """Issues with long filler bodies and 0-2 trigger phrases buried at random offsets."""
+    rng = random.Random(seed)
+    issues = []
+    for number in range(1, count + 1):
+        words = [rng.choice(FILLER_WORDS) for _ in range(body_words)]
+        for phrase in rng.sample(TRIGGER_PHRASES, rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words) + 1), phrase)
+        issues.append(FakeIssue(number, f"Issue {number}: {rng.choice(FILLER_WORDS)} broken", " ".join(words)))
+    return issues
+
+
+def legacy_classify(patterns, issue):
+    """The original per-pattern classify_issue loop, kept as the baseline."""
+    text = f"{issue.title} {issue.body or ''}".lower()
+    for category, category_patterns in patterns.items():
+        for pattern in category_patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                return category
+    return None
+
+
+def combined_classify(combined, group_category, issue):
+    """All categories from one named-group alternation (the rejected design)."""
+    found = set()
+    for hit in combined.finditer(f"{issue.title} {issue.body or ''}"):
+        found.add(group_category[hit.lastgroup])
+    return found
+
+
+def bench_classifier(args):
+    auto_fix = load_auto_fix()
+    issues = synthetic_issues(args.issues, args.body_words)
+    corpus_mb = sum(len(i.title) + len(i.body) for i in issues) / 1e6
+    print(f"Corpus: {len(issues)} issues, {corpus_mb:.1f} MB")
+
+    legacy, legacy_s = timed(lambda: [legacy_classify(auto_fix.FIXABLE_PATTERNS, i) for i in issues])
+
+    classifier, compile_s = timed(auto_fix.IssueClassifier)
+    batch, batch_s = timed(classifier.classify, issues)
+    primary = [classifier.primary(matches) for matches in batch]
+
+    rows = [
+        ("legacy (first hit only)", legacy_s),
+        ("compiled (all categories)", batch_s),
+    ]
+    if args.combined:
+        group_category, alternatives = {}, []
+        for ci, (category, patterns) in enumerate(auto_fix.FIXABLE_PATTERNS.items()):
+            for pi, pattern in enumerate(patterns):
+                group_category[f"c{ci}p{pi}"] = category
+                alternatives.append(f"(?P<c{ci}p{pi}>{pattern})")
+        combined = re.compile("(?=" + "|".join(alternatives) + ")", re.IGNORECASE)
+        _, combined_s = timed(lambda: [combined_classify(combined, group_category, i) for i in issues])
+        rows.append(("combined alternation", combined_s))
+
+    mismatches = sum(1 for a, b in zip(legacy, primary) if a != b)
+    all_hits = sum(len(matches) for matches in batch)
+
+    print(f"{'engine':<28}{'seconds':>10}{'issues/s':>14}")
+    for name, seconds in rows:
+        print(f"{name:<28}{seconds:>10.3f}{len(issues) / seconds:>14,.0f}")
+    print(f"compile: {compile_s * 1000:.2f} ms, category hits: {all_hits}, "
+          f"primary mismatches vs legacy: {mismatches}")
+    return 1 if mismatches else 0
+
+
+# ── JSDoc scanner ────────────────────────────────────────────────────────────
+
+TSX_BLOCKS = [
+    """/**
+ * Documented helper {n}.
+ */
+export function helper{n}(value: string, count = 2): string {{
+  return value.repeat(count)
+}}
+""",
+    """export async function load{n}(
+  id: string,
+  {{ retries, label }}: {{ retries: number; label: string }} = {{ retries: 1, label: "a,b" }},
+  ...rest: unknown[]
+): Promise<void> {{
+  const url = `/api/items/${{id}}?q=${{encodeURIComponent("{{")}}`
+  if (/[{{]/.test(url)) return
+}}
+""",
+    """export const fetch{n} = async (req: Request, ctx: {{ params: {{ id: string }} }}) => {{
+  try {{
+    return await fetch(req)
+  }} catch (error) {{
+    return null
+  }}
+}}
+""",
+    """export const Card{n}: React.FC<{{ title: string }}> = ({{ title }}) => (
+  <div className="card">
+    <h2>{{title}}</h2>
+    <p>It's item {n} {{"}}"}}</p>
+  </div>
+)
+""",
+    """const internal{n} = {{ nested: {{ deep: [1, 2, 3] }} }} // not exported {{
+export const double{n} = x => x * 2
+""",
+]
+
+
+def synthetic_tsx(lines):
+    """A .tsx module of roughly `lines` lines cycling through the TSX_BLOCKS shapes."""
+    out, count, n = ['"use client"\n', 'import React from "react"\n'], 2, 0
+    while count < lines:
+        block = TSX_BLOCKS[n % len(TSX_BLOCKS)].format(n=n)
+        out.append(block)
+        count += block.count("\n")
+        n += 1
+    return "".join(out)
+
+
+def legacy_jsdoc_targets(content):
+    """The original per-line regex + 5-line lookback used by add_jsdoc_comments."""
+    lines = content.split("\n")
+    found = []
+    for i, line in enumerate(lines):
+        if re.match(r"^export\s+(async\s+)?function\s+\w+", line):
+            if not any("*/" in lines[j] for j in range(max(0, i - 5), i)):
+                match = re.match(r"^export\s+(?:async\s+)?function\s+(\w+)\s*\(([^)]*)\)", line)
+                if match:
+                    found.append(match.group(1))
+    return found
+
+
+def bench_jsdoc(args):
+    auto_fix = load_auto_fix()
+    sizes = [args.lines // 4, args.lines // 2, args.lines, args.lines * 2]
+    print(f"{'lines':>9}{'MB':>7}{'legacy s':>10}{'found':>7}{'scanner s':>11}{'found':>7}{'us/line':>9}")
+    per_line = []
+    for lines in sizes:
+        content = synthetic_tsx(lines)
+        real_lines = content.count("\n")
+        legacy, legacy_s = timed(legacy_jsdoc_targets, content)
+        insertions, scan_s = timed(auto_fix.jsdoc_insertions, content)
+        per_line.append(scan_s / real_lines * 1e6)
+        print(f"{real_lines:>9}{len(content) / 1e6:>7.1f}{legacy_s:>10.3f}{len(legacy):>7}"
+              f"{scan_s:>11.3f}{len(insertions):>7}{per_line[-1]:>9.2f}")
+    spread = max(per_line) / min(per_line)
+    print(f"scanner cost per line varies {spread:.2f}x across a {sizes[-1] // sizes[0]}x size range "
+          f"({'linear' if spread < 1.5 else 'NOT linear'})")
+    return 0 if spread < 1.5 else 1
+
+
+# ── End to end ───────────────────────────────────────────────────────────────
+
+CATEGORY_PHRASES = {
+    "missing_type": "TypeScript error TS2345 in the planner",
+    "missing_import": "Cannot find module '@/lib/cache' after the refactor",
+    "unused_variable": "unused variable in research-panel",
+    "missing_env": "missing environment variable for the search provider",
+    "documentation": "README is out of date",
+    "dependency": "outdated package with a known vulnerability",
+    "error_handling": "unhandled error in the enrich route, needs try/catch",
+    "accessibility": "missing alt text for screen reader users",
+}
+
+ROUTE_TEMPLATE = """import {{ NextResponse }} from "next/server"
+
+export async function GET(request: Request) {{
+  const key = process.env.SERVICE_{n}_KEY
+  const url = new URL(request.url)
+  return NextResponse.json({{ ok: Boolean(key), path: url.pathname }})
+}}
+"""
+
+GUARDED_ROUTE_TEMPLATE = """import {{ NextResponse }} from "next/server"
+
+export async function POST(request: Request) {{
+  try {{
+    const body = await request.json()
+    return NextResponse.json({{ received: body, region: process.env.REGION_{n} }})
+  }} catch (error) {{
+    return NextResponse.json({{ error: "bad request" }}, {{ status: 400 }})
+  }}
+}}
+"""
+
+COMPONENT_TEMPLATE = """{directive}import {{ useState, useEffect }} from "react"
+
+export default function Widget{n}({{ label }}: {{ label: string }}) {{
+  const [count, setCount] = useState(0)
+  useEffect(() => {{ document.title = `${{label}} ${{count}}` }}, [label, count])
+  return <button onClick={{() => setCount(count + 1)}}>{{label}}: {{count}}</button>
+}}
+"""
+
+LIB_TEMPLATE = """export function format{n}(value: number, digits = 2): string {{
+  return value.toFixed(digits)
+}}
+
+export const parse{n} = async (input: string) => {{
+  return JSON.parse(input)
+}}
+"""
+
+# npm/npx stand-ins so the dependency handler stays offline and instant
+FAKE_TOOL = "#!/bin/sh\nexit 0\n"
+
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def write_file(root, path, content):
+    full = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w") as f:
+        f.write(content)
+
+
+def synthetic_repo(root, files):
+    """A Next.js-style tree with about `files` sources split across routes, components and lib."""
+    routes = max(1, files // 3)
+    components = max(1, files // 3)
+    libs = max(1, files - routes - components)
+    for n in range(routes):
+        template = GUARDED_ROUTE_TEMPLATE if n % 2 else ROUTE_TEMPLATE
+        write_file(root, f"app/api/service-{n}/route.ts", template.format(n=n))
+    for n in range(components):
+        directive = '"use client"\n\n' if n % 3 else ""
+        write_file(root, f"components/widget-{n}.tsx", COMPONENT_TEMPLATE.format(n=n, directive=directive))
+    for n in range(libs):
+        write_file(root, f"lib/format-{n}.ts", LIB_TEMPLATE.format(n=n))
+    write_file(root, ".env.example", "REGION_0=\n")
+    write_file(root, "package.json", json.dumps({"name": "synthetic", "private": True}, indent=2) + "\n")
+    write_file(root, "README.md", "# Synthetic app\n")
+    return routes + components + libs
+
+
+def synthetic_issue_file(count, classifier, seed=0):
+    """`count` fake-github.py issues cycling through every classifier category."""
+    rng = random.Random(seed)
+    categories = list(CATEGORY_PHRASES)
+    issues = []
+    for number in range(1, count + 1):
+        category = categories[(number - 1) % len(categories)]
+        issue = FakeIssue(number, f"Issue {number}: {CATEGORY_PHRASES[category]}",
+                          " ".join(rng.choice(FILLER_WORDS) for _ in range(40)))
+        assert classifier.primary(classifier.matches(classifier.issue_text(issue))) == category, category
+        issues.append({
+            "number": number, "title": issue.title, "body": issue.body, "labels": ["bug"],
+            "updated_at": f"2026-01-01T00:00:{number % 60:02d}Z",
+        })
+    return issues
+
+
+def load_fake_github():
+    spec = importlib.util.spec_from_file_location("fake_github", os.path.join(SCRIPT_DIR, "fake-github.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_e2e(workdir, files, issue_count, args, auto_fix, fake_github):
+    """Build one synthetic repo + remote, run the script against the fake API; returns a result row."""
+    remote, work, bin_dir = (os.path.join(workdir, d) for d in ("remote.git", "work", "bin"))
+    git(workdir, "init", "-q", "--bare", "-b", "main", remote)
+    os.makedirs(work)
+    sources = synthetic_repo(work, files)
+    git(work, "init", "-q", "-b", "main")
+    git(work, "-c", "user.name=bench", "-c", "user.email=bench@example.com", "add", "-A")
+    git(work, "-c", "user.name=bench", "-c", "user.email=bench@example.com", "commit", "-q", "-m", "synthetic")
+    git(work, "remote", "add", "origin", remote)
+    git(work, "push", "-q", "origin", "main")
+    os.makedirs(bin_dir)
+    for tool in ("npm", "npx", "gh"):
+        write_file(bin_dir, tool, FAKE_TOOL)
+        os.chmod(os.path.join(bin_dir, tool), 0o755)
+
+    state = fake_github.FakeGitHub(synthetic_issue_file(issue_count, auto_fix.IssueClassifier()))
+    server = fake_github.serve(state)
+    api = f"http://127.0.0.1:{server.server_port}"
+    trace = os.path.join(workdir, "trace.json")
+    env = dict(
+        os.environ,
+        PATH=bin_dir + os.pathsep + os.environ.get("PATH", ""),
+        GITHUB_TOKEN="bench", REPO_NAME="bench/synthetic",
+        GITHUB_API_URL=api, GITHUB_GRAPHQL_URL=f"{api}/graphql",
+        MAX_FIXES=str(args.max_fixes), DRY_RUN="false",
+        AUTO_FIX_WORKERS=str(args.workers), AUTO_FIX_ASYNC="true" if args.use_async else "false",
+        AUTO_FIX_CACHE_DIR=os.path.join(workdir, "cache"), AUTO_FIX_TRACE=trace,
+        AUTO_FIX_WRITE_INTERVAL="0",  # the fake API has no write spacing to respect
+    )
+    env.pop("GITHUB_STEP_SUMMARY", None)
+    env.pop("GITHUB_OUTPUT", None)
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPT_DIR, "auto-fix-issues.py")],
+        cwd=work, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+    )
+    output = process.stdout.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - started
+    server.shutdown()
+    if process.returncode:
+        sys.stderr.write(output.decode(errors="replace"))
+        raise RuntimeError(f"auto-fix-issues.py exited with {process.returncode}")
+
+    with open(trace) as f:
+        main_span = next(e for e in json.load(f)["traceEvents"] if e["name"] == "main")
+    return {
+        "files": sources,
+        "issues": issue_count,
+        "wall_s": wall,
+        "subprocesses": main_span["args"]["subprocesses"],
+        "peak_rss_mb": usage.ru_maxrss / 1024,  # KiB on Linux
+        "api_calls": state.total_requests,
+        "prs": len(state.pulls),
+    }
+
+
+def bench_e2e(args):
+    auto_fix = load_auto_fix()
+    fake_github = load_fake_github()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    print(f"{'files':>7}{'issues':>8}{'wall s':>9}{'procs':>7}{'RSS MB':>8}{'API':>6}{'PRs':>5}")
+    rows = []
+    for files in sizes:
+        workdir = tempfile.mkdtemp(prefix=f"auto-fix-e2e-{files}-")
+        try:
+            row = run_e2e(workdir, files, args.issues or max(8, files // 10), args, auto_fix, fake_github)
+        finally:
+            if args.keep:
+                print(f"  kept {workdir}")
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+        rows.append(row)
+        print(f"{row['files']:>7}{row['issues']:>8}{row['wall_s']:>9.2f}{row['subprocesses']:>7}"
+              f"{row['peak_rss_mb']:>8.1f}{row['api_calls']:>6}{row['prs']:>5}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+# ── Extraction ───────────────────────────────────────────────────────────────
+
+ENV_FORMS_TEMPLATE = """const {{ DB_URL_{n}, CACHE_TTL_{n}: ttl = "60" }} = process.env
+export const config{n} = {{
+  secret: process.env["SECRET_{n}"],
+  api: import.meta.env.VITE_API_{n},
+}}
+"""
+
+LEGACY_ENV_RE = re.compile(r"process\.env\.([A-Z_]+)")
+LEGACY_HOOK_IMPORT_RE = re.compile(r"import.*\{(.*)")
+LEGACY_ROUTE_RE = re.compile(r"export\s+async\s+function\s+(GET|POST|PUT|DELETE|PATCH)\b")
+
+
+def legacy_extract(root, paths):
+    """The three separate single-threaded scans the combined matcher replaced."""
+    env_vars = set()
+    for path in paths:
+        with open(os.path.join(root, path)) as f:
+            content = f.read()
+        env_vars.update(LEGACY_ENV_RE.findall(content))
+        for match in LEGACY_HOOK_IMPORT_RE.finditer(content):
+            re.findall(r"\buse(State|Effect|Ref|Callback|Memo|Context)\b", match.group(1))
+        LEGACY_ROUTE_RE.findall(content)
+    return env_vars
+
+
+def combined_extract(auto_fix, root, paths):
+    """The same three fields via extract_references (one EXTRACT_RE pass per file)."""
+    env_vars = set()
+    for path in paths:
+        with open(os.path.join(root, path)) as f:
+            env_vars |= auto_fix.extract_references(f.read())[0]
+    return env_vars
+
+
+def bench_extract(args):
+    auto_fix = load_auto_fix()
+    root = tempfile.mkdtemp(prefix="auto-fix-extract-")
+    try:
+        synthetic_repo(root, args.files)
+        for n in range(args.files // 4):
+            write_file(root, f"config/env-{n}.ts", ENV_FORMS_TEMPLATE.format(n=n))
+        paths = sorted(auto_fix.list_source_blobs(root, use_git=False))
+        print(f"Tree: {len(paths)} files, {os.cpu_count()} CPUs")
+
+        print(f"{'engine':<30}{'seconds':>9}{'files/s':>11}{'speedup':>9}{'env vars':>10}")
+
+        def row(name, seconds, env_vars, speedup=""):
+            print(f"{name:<30}{seconds:>9.3f}{len(paths) / seconds:>11,.0f}{speedup:>9}{len(env_vars):>10}")
+
+        legacy, legacy_s = timed(legacy_extract, root, paths)
+        row("legacy env/hook/route scans", legacy_s, legacy)
+        combined, combined_s = timed(combined_extract, auto_fix, root, paths)
+        row("combined matcher", combined_s, combined)
+
+        baseline = reference = None
+        workers = [int(w) for w in args.workers.split(",")] if args.workers else sorted(
+            {1, 2, 4, 8, os.cpu_count() or 1} & set(range(1, (os.cpu_count() or 1) + 1))
+        )
+        auto_fix.EXTRACT_PARALLEL_MIN = 0
+        for count in workers:
+            scans, seconds = timed(auto_fix.extract_sources, paths, root, count)
+            env_vars = set().union(*(set(scan["env_vars"]) for scan in scans.values()))
+            baseline = baseline or seconds
+            reference = reference or scans
+            if scans != reference:
+                print(f"{count} workers: results differ from 1 worker")
+                return 1
+            row(f"full scan_source, {count} worker(s)", seconds, env_vars, f"{baseline / seconds:.2f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+# ── Throttling ───────────────────────────────────────────────────────────────
+
+def throttle_workload(reads, writes):
+    """Interleaved (kind, method, path) calls, writes spread evenly through the reads."""
+    calls = [("read", "GET", f"/repos/o/r/issues?per_page=10&page={n % 5 + 1}") for n in range(reads)]
+    step = max(1, len(calls) // max(1, writes))
+    for n in range(writes):
+        calls.insert(min(len(calls), n * (step + 1)), ("write", "POST", "/repos/o/r/issues/1/comments"))
+    return calls
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    return statistics.quantiles(values, n=100)[pct - 1] if len(values) > 1 else values[0]
+
+
+def run_throttle(mode, args, auto_fix, fake_github):
+    state = fake_github.FakeGitHub(
+        [{"number": n, "title": f"Issue {n}", "updated_at": f"2026-01-01T00:00:{n % 60:02d}Z"} for n in range(1, 60)],
+        rate_limit=args.rate_limit, window=args.window, max_concurrent=args.max_concurrent,
+        write_interval=args.write_interval, latency=args.latency, retry_after=1,
+    )
+    server = fake_github.serve(state)
+    url = f"http://127.0.0.1:{server.server_port}"
+    client = auto_fix.GitHubClient("fake", graphql_url=f"{url}/graphql", api_url=url, cache_dir="")
+
+    def call(kind, method, path):
+        started = time.perf_counter()
+        try:
+            if mode == "scheduled":
+                client.request(method, path, {"body": "hi"} if kind == "write" else None)
+            else:
+                client.session.request(method, url + path, json={"body": "hi"} if kind == "write" else None,
+                                       timeout=30).raise_for_status()
+            ok = True
+        except Exception:
+            ok = False
+        return kind, ok, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(lambda c: call(*c), throttle_workload(args.reads, args.writes)))
+    wall = time.perf_counter() - started
+    server.shutdown()
+
+    latency = {kind: sorted(s for k, ok, s in results if k == kind and ok) for kind in ("read", "write")}
+    return {
+        "mode": mode,
+        "ok": sum(ok for _, ok, _ in results),
+        "failed": sum(not ok for _, ok, _ in results),
+        "throttled": sum(v for k, v in state.requests.items() if k.startswith("throttled:")),
+        "wall": wall,
+        "write_p50": percentile(latency["write"], 50) * 1000,
+        "write_p95": percentile(latency["write"], 95) * 1000,
+        "read_p50": percentile(latency["read"], 50) * 1000,
+        "read_p95": percentile(latency["read"], 95) * 1000,
+        "concurrency": client.scheduler.limit if mode == "scheduled" else args.threads,
+    }
+
+
+def bench_throttle(args):
+    auto_fix, fake_github = load_auto_fix(), load_fake_github()
+    auto_fix.WRITE_INTERVAL = args.write_interval  # the spacing the fake server enforces
+    print(f"{args.reads} reads + {args.writes} writes on {args.threads} threads; server allows "
+          f"{args.max_concurrent} in flight, one write per {args.write_interval}s, {args.latency}ms latency")
+    print(f"{'client':<13}{'ok':>6}{'failed':>8}{'throttled':>11}{'wall s':>8}"
+          f"{'write p50/p95 ms':>19}{'read p50/p95 ms':>18}{'concurrency':>13}")
+    for mode in ("unscheduled", "scheduled"):
+        r = run_throttle(mode, args, auto_fix, fake_github)
+        print(f"{r['mode']:<13}{r['ok']:>6}{r['failed']:>8}{r['throttled']:>11}{r['wall']:>8.2f}"
+              f"{r['write_p50']:>10.0f}/{r['write_p95']:<8.0f}{r['read_p50']:>9.0f}/{r['read_p95']:<8.0f}"
+              f"{r['concurrency']:>13.1f}")
+    return 0
+
+
+# ── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    classifier = sub.add_parser("classifier", help="compiled classifier vs the legacy loop")
+    classifier.add_argument("--issues", type=int, default=10000)
+    classifier.add_argument("--body-words", type=int, default=600)
+    classifier.add_argument("--combined", action="store_true",
+                            help="also time a single named-group alternation")
+    classifier.set_defaults(func=bench_classifier)
+
+    jsdoc = sub.add_parser("jsdoc", help="streaming declaration scanner vs the per-line scan")
+    jsdoc.add_argument("--lines", type=int, default=50000, help="middle size; also runs /4, /2 and x2")
+    jsdoc.set_defaults(func=bench_jsdoc)
+
+    e2e = sub.add_parser("e2e", help="whole script against a synthetic repo and fake GitHub API")
+    e2e.add_argument("--sizes", default="30,300,3000", help="comma-separated source file counts")
+    e2e.add_argument("--issues", type=int, default=0, help="issues per size (default: files/10, min 8)")
+    e2e.add_argument("--max-fixes", type=int, default=3)
+    e2e.add_argument("--workers", type=int, default=1)
+    e2e.add_argument("--async", dest="use_async", action="store_true", help="AUTO_FIX_ASYNC=true")
+    e2e.add_argument("--json", help="also write the rows to this file")
+    e2e.add_argument("--keep", action="store_true", help="keep the generated repos")
+    e2e.set_defaults(func=bench_e2e)
+
+    extract = sub.add_parser("extract", help="combined env/hook/route extraction across worker counts")
+    extract.add_argument("--files", type=int, default=20000)
+    extract.add_argument("--workers", help="comma-separated worker counts (default: powers of two up to CPUs)")
+    extract.set_defaults(func=bench_extract)
+
+    throttle = sub.add_parser("throttle", help="request scheduler vs bare requests under simulated rate limits")
+    throttle.add_argument("--reads", type=int, default=300)
+    throttle.add_argument("--writes", type=int, default=30)
+    throttle.add_argument("--threads", type=int, default=16)
+    throttle.add_argument("--max-concurrent", type=int, default=4)
+    throttle.add_argument("--write-interval", type=float, default=0.05)
+    throttle.add_argument("--latency", type=float, default=20.0, help="server latency in ms")
+    throttle.add_argument("--rate-limit", type=int, default=5000)
+    throttle.add_argument("--window", type=float, default=3600.0)
+    throttle.set_defaults(func=bench_throttle)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Fake GitHub API
+===============
+A small local stand-in for the parts of the GitHub API that
+scripts/auto-fix-issues.py talks to, so it can be exercised offline.
+
+Usage:
+    python scripts/fake-github.py --issues issues.json [--port 8765]
+
+    GITHUB_API_URL=http://127.0.0.1:8765 \
+    GITHUB_GRAPHQL_URL=http://127.0.0.1:8765/graphql \
+    GITHUB_TOKEN=fake python scripts/auto-fix-issues.py
+
+REST GETs carry an ETag and honour If-None-Match with a 304, which (as
+on github.com) does not decrement X-RateLimit-Remaining. Pull requests,
+label/assignee updates and issue comments are recorded in memory.
+
+Throttling can be simulated the way github.com does it:
+
+    --rate-limit N --window S   primary limit: N calls per S-second window,
+                                then 403 with X-RateLimit-Remaining: 0
+    --max-concurrent N          secondary limit: more than N requests in
+                                flight get 403 plus Retry-After
+    --write-interval S          secondary limit: writes closer together
+                                than S seconds get 429 plus Retry-After
+    --latency MS                response time, plus MS/4 per request
+                                already in flight (so load shows up as
+                                latency before it shows up as errors)
+
+Every response carries X-RateLimit-Limit/Remaining/Reset.
+
+The issues file is a JSON list of objects with number, title, body,
+labels (list of names), updated_at and optionally is_pull_request.
+
+Author: vanshaj2023
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+RATE_LIMIT = 5000
+CLOSING_RE = re.compile(r"\b(?:close[sd]?|fix(?:e[sd])?|resolve[sd]?)\s+#(\d+)", re.IGNORECASE)
+
+
+class FakeGitHub:
+    """In-memory repository state plus per-endpoint request counters."""
+
+    def __init__(self, issues=None, pulls=None, rate_limit=RATE_LIMIT, window=3600.0,
+                 max_concurrent=0, write_interval=0.0, latency=0.0, retry_after=1):
+        self.issues = sorted(issues or [], key=lambda i: i.get("updated_at", ""), reverse=True)
+        self.pulls = list(pulls or [])
+        self.comments = []
+        self.requests = {}
+        self.rate_limit = rate_limit
+        self.rate_limit_remaining = rate_limit
+        self.window = window
+        self.reset_at = time.time() + window
+        self.max_concurrent = max_concurrent
+        self.write_interval = write_interval
+        self.last_write = 0.0
+        self.latency = latency / 1000
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    @property
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    def rate_headers(self):
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(0, self.rate_limit_remaining)),
+            "X-RateLimit-Reset": str(int(self.reset_at)),
+        }
+
+    def admit(self, write):
+        """
+        Apply the simulated limits to a request that just arrived.
+
+        Returns None to serve it, else (status, message, headers) to reject
+        it with. Rejections are counted under "throttled:*".
+        """
+        with self.lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.rate_limit_remaining = self.rate_limit
+                self.reset_at = now + self.window
+            if self.rate_limit_remaining <= 0:
+                return "primary", 403, "API rate limit exceeded for user.", {}
+            if self.max_concurrent and self.in_flight > self.max_concurrent:
+                return "concurrency", 403, "You have exceeded a secondary rate limit.", {
+                    "Retry-After": str(self.retry_after)}
+            if write and self.write_interval:
+                if now - self.last_write < self.write_interval:
+                    return "writes", 429, "You have exceeded a secondary rate limit.", {
+                        "Retry-After": str(self.retry_after)}
+                self.last_write = now
+        return None
+
+    def delay(self):
+        """Simulated server time: base latency growing with the requests in flight."""
+        if self.latency:
+            time.sleep(self.latency * (1 + self.in_flight / 4))
+
+    # ── GraphQL operations ──
+
+    def open_issues(self, variables):
+        """OpenIssues: a page of open issues, newest-updated first."""
+        open_items = [i for i in self.issues if i.get("state", "open") == "open"]
+        start = int(variables.get("cursor") or 0)
+        page = open_items[start:start + variables["pageSize"]]
+        end = start + len(page)
+        return {"repository": {"issues": {
+            "pageInfo": {"hasNextPage": end < len(open_items), "endCursor": str(end)},
+            "nodes": [{
+                "__typename": "PullRequest" if i.get("is_pull_request") else "Issue",
+                "number": i["number"],
+                "title": i["title"],
+                "body": i.get("body", ""),
+                "updatedAt": i.get("updated_at"),
+                "labels": {"nodes": [{"name": name} for name in i.get("labels", [])]},
+            } for i in page],
+        }}}
+
+    def open_pulls(self, variables):
+        """OpenPulls: open PRs with head branch and closing issue references."""
+        open_items = [p for p in self.pulls if p.get("state", "open") == "open"]
+        start = int(variables.get("cursor") or 0)
+        page = open_items[start:start + 100]
+        end = start + len(page)
+        return {"repository": {"pullRequests": {
+            "pageInfo": {"hasNextPage": end < len(open_items), "endCursor": str(end)},
+            "nodes": [{
+                "number": p["number"],
+                "headRefName": p["head"],
+                "body": p.get("body", ""),
+                "closingIssuesReferences": {"nodes": [
+                    {"number": int(n)} for n in CLOSING_RE.findall(p.get("body") or "")
+                ]},
+            } for p in page],
+        }}}
+
+    GRAPHQL_OPERATIONS = {
+        "OpenIssues": open_issues,
+        "OpenPulls": open_pulls,
+    }
+
+    # ── REST resources ──
+
+    def rest_issue(self, issue):
+        item = {
+            "number": issue["number"],
+            "title": issue["title"],
+            "body": issue.get("body", ""),
+            "state": issue.get("state", "open"),
+            "updated_at": issue.get("updated_at"),
+            "labels": [{"name": name} for name in issue.get("labels", [])],
+        }
+        if issue.get("is_pull_request"):
+            item["pull_request"] = {"url": ""}
+        return item
+
+    def list_issues(self, query):
+        """GET /repos/{owner}/{name}/issues, paged with a Link header."""
+        state = query.get("state", "open")
+        items = [i for i in self.issues if state == "all" or i.get("state", "open") == state]
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        next_page = page + 1 if page * per_page < len(items) else None
+        return [self.rest_issue(i) for i in chunk], next_page
+
+    def list_pulls(self, query):
+        """GET /repos/{owner}/{name}/pulls"""
+        state = query.get("state", "open")
+        items = [p for p in self.pulls if state == "all" or p.get("state", "open") == state]
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        next_page = page + 1 if page * per_page < len(items) else None
+        return [{
+            "number": p["number"],
+            "state": p.get("state", "open"),
+            "body": p.get("body", ""),
+            "head": {"ref": p["head"]},
+            "html_url": p.get("html_url", ""),
+        } for p in chunk], next_page
+
+    REST_GET = [
+        (re.compile(r"^/repos/[^/]+/[^/]+/issues$"), "issues", list_issues),
+        (re.compile(r"^/repos/[^/]+/[^/]+/pulls$"), "pulls", list_pulls),
+    ]
+
+    def create_pull(self, match, payload):
+        """POST /repos/{owner}/{name}/pulls"""
+        with self.lock:
+            number = max([i["number"] for i in self.issues] + [p["number"] for p in self.pulls] + [0]) + 1
+            pull = dict(payload, number=number, labels=[], assignees=[],
+                        html_url=f"https://github.com/{match['repo']}/pull/{number}")
+            self.pulls.append(pull)
+        return 201, pull
+
+    def update_issue(self, match, payload):
+        """PATCH /repos/{owner}/{name}/issues/{number} (issues and PRs alike)"""
+        number = int(match["number"])
+        with self.lock:
+            target = next((p for p in self.pulls if p["number"] == number), None) or next(
+                (i for i in self.issues if i["number"] == number), None
+            )
+            if target is None:
+                return 404, {"message": "Not Found"}
+            if "labels" in payload:
+                target["labels"] = list(payload["labels"])
+            if "assignees" in payload:
+                target["assignees"] = list(payload["assignees"])
+        return 200, {"number": number, "labels": [{"name": l} for l in target["labels"]]}
+
+    def create_comment(self, match, payload):
+        """POST /repos/{owner}/{name}/issues/{number}/comments"""
+        with self.lock:
+            self.comments.append({"issue": int(match["number"]), "body": payload.get("body", "")})
+            comment_id = len(self.comments)
+        return 201, {"id": comment_id, "body": payload.get("body", "")}
+
+    REST_WRITE = [
+        ("POST", re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/pulls$"), "pulls:create", create_pull),
+        ("PATCH", re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/issues/(?P<number>\d+)$"), "issues:update", update_issue),
+        ("POST", re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/issues/(?P<number>\d+)/comments$"),
+         "comments:create", create_comment),
+    ]
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Routes requests to the FakeGitHub instance attached to the server."""
+
+    server_version = "FakeGitHub/1.0"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in dict(self.state.rate_headers(), **(headers or {})).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def throttled(self, write):
+        """Reject the request if a simulated limit applies; True when it was rejected."""
+        rejection = self.state.admit(write)
+        if rejection is None:
+            return False
+        kind, status, message, headers = rejection
+        self.state.count(f"throttled:{kind}")
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))  # keep the connection usable
+        self.send_json(status, {"message": message}, headers)
+        return True
+
+    def parse_request(self):
+        # A request counts as in flight from its request line until the response
+        # (not while a keep-alive connection sits idle)
+        parsed = super().parse_request()
+        if parsed:
+            self.in_flight = True
+            with self.state.lock:
+                self.state.in_flight += 1
+        return parsed
+
+    def handle_one_request(self):
+        self.in_flight = False
+        try:
+            super().handle_one_request()
+        finally:
+            if self.in_flight:
+                with self.state.lock:
+                    self.state.in_flight -= 1
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.throttled(write=False):
+            return
+        self.state.delay()
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        for pattern, name, resource in self.state.REST_GET:
+            if not pattern.match(url.path):
+                continue
+            payload, next_page = resource(self.state, query)
+            body = json.dumps(payload).encode()
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            headers = {"ETag": etag}
+            if next_page:
+                query["page"] = str(next_page)
+                next_url = f"http://{self.headers['Host']}{url.path}?" + "&".join(
+                    f"{k}={v}" for k, v in query.items()
+                )
+                headers["Link"] = f'<{next_url}>; rel="next"'
+            if self.headers.get("If-None-Match") == etag:
+                self.state.count(f"rest:{name}:304")
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                for name, value in self.state.rate_headers().items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+            self.state.count(f"rest:{name}")
+            with self.state.lock:
+                self.state.rate_limit_remaining -= 1
+            self.send_json(200, payload, headers)
+            return
+        self.send_json(404, {"message": "Not Found"})
+
+    def write(self, method):
+        """Dispatch a REST write; each one costs a rate-limit point."""
+        path = urlsplit(self.path).path
+        for route_method, pattern, name, resource in self.state.REST_WRITE:
+            match = pattern.match(path)
+            if route_method != method or not match:
+                continue
+            if self.throttled(write=True):
+                return True
+            self.state.delay()
+            self.state.count(f"rest:{name}")
+            with self.state.lock:
+                self.state.rate_limit_remaining -= 1
+            status, payload = resource(self.state, match, self.read_json())
+            self.send_json(status, payload)
+            return True
+        return False
+
+    def do_PATCH(self):
+        if not self.write("PATCH"):
+            self.send_json(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        if self.write("POST"):
+            return
+        if self.path.rstrip("/").endswith("/graphql"):
+            if self.throttled(write=False):
+                return
+            self.state.delay()
+            with self.state.lock:
+                self.state.rate_limit_remaining -= 1
+            payload = self.read_json()
+            operation = self.state.GRAPHQL_OPERATIONS.get(payload.get("operationName"))
+            self.state.count(f"graphql:{payload.get('operationName')}")
+            if operation is None:
+                self.send_json(200, {"errors": [{"message": "unknown operation"}]})
+                return
+            self.send_json(200, {"data": operation(self.state, payload.get("variables") or {})})
+            return
+        self.send_json(404, {"message": "Not Found"})
+
+
+def serve(state, host="127.0.0.1", port=0, verbose=False):
+    """Start a fake server on a background thread; returns it (see server.server_port)."""
+    server = ThreadingHTTPServer((host, port), FakeGitHubHandler)
+    server.state = state
+    server.verbose = verbose
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", help="JSON file with the issues to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate-limit", type=int, default=RATE_LIMIT, help="primary limit per window")
+    parser.add_argument("--window", type=float, default=3600.0, help="primary limit window in seconds")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="secondary limit on requests in flight")
+    parser.add_argument("--write-interval", type=float, default=0.0, help="minimum seconds between writes")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After sent with secondary limits")
+    parser.add_argument("--latency", type=float, default=0.0, help="base response time in ms")
+    args = parser.parse_args()
+
+    issues = []
+    if args.issues:
+        with open(args.issues, "r") as f:
+            issues = json.load(f)
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeGitHubHandler)
+    server.state = FakeGitHub(
+        issues, rate_limit=args.rate_limit, window=args.window, max_concurrent=args.max_concurrent,
+        write_interval=args.write_interval, latency=args.latency, retry_after=args.retry_after,
+    )
+    server.verbose = True
+    print(f"Fake GitHub API on http://{args.host}:{server.server_port} "
+          f"({len(issues)} issues, started {datetime.now(timezone.utc).isoformat()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Requests served: {json.dumps(server.state.requests, sort_keys=True)}")
+        print(f"Pull requests opened: {len(server.state.pulls)}, comments: {len(server.state.comments)}")
+
+
+if __name__ == "__main__":
+    main()
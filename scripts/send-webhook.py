@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Send Webhook
+============
+Replay recorded GitHub webhook deliveries against a local
+`auto-fix-issues.py --daemon`, the way GitHub would send them.
+
+Usage:
+    python scripts/send-webhook.py scripts/webhooks/issues-opened.json \
+        [--url http://127.0.0.1:8787/] [--event issues] [--secret S]
+
+Each file is posted with X-GitHub-Event and a fresh X-GitHub-Delivery id;
+with --secret (or AUTO_FIX_WEBHOOK_SECRET) the body is also signed with
+X-Hub-Signature-256. --repo rewrites repository.full_name so recorded
+payloads can target whatever REPO_NAME the daemon runs with.
+
+Author: vanshaj2023
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import uuid
+
+import requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("payloads", nargs="+", help="webhook JSON files to send, in order")
+    parser.add_argument("--url", default="http://127.0.0.1:8787/")
+    parser.add_argument("--event", default="issues", help="X-GitHub-Event header")
+    parser.add_argument("--secret", default=os.environ.get("AUTO_FIX_WEBHOOK_SECRET", ""))
+    parser.add_argument("--repo", help="override repository.full_name in every payload")
+    args = parser.parse_args()
+
+    failed = 0
+    for path in args.payloads:
+        with open(path, "r") as f:
+            payload = json.load(f)
+        if args.repo:
+            payload.setdefault("repository", {})["full_name"] = args.repo
+        body = json.dumps(payload).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "X-GitHub-Event": args.event,
+            "X-GitHub-Delivery": str(uuid.uuid4()),
+        }
+        if args.secret:
+            digest = hmac.new(args.secret.encode(), body, hashlib.sha256).hexdigest()
+            headers["X-Hub-Signature-256"] = f"sha256={digest}"
+        response = requests.post(args.url, data=body, headers=headers, timeout=30)
+        print(f"{path}: {response.status_code} {response.text.strip()}")
+        failed += response.status_code >= 400
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
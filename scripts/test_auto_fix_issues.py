@@ -0,0 +1,267 @@
+"""Unit tests for the pure parts of auto-fix-issues.py (no git, no GitHub)."""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+spec = importlib.util.spec_from_file_location(
+    "auto_fix_issues", os.path.join(os.path.dirname(os.path.abspath(__file__)), "auto-fix-issues.py")
+)
+auto_fix = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = auto_fix
+spec.loader.exec_module(auto_fix)
+
+
+# ── scan_declarations ────────────────────────────────────────────────────────
+
+def names(content):
+    return [(d.name, d.params, d.documented) for d in auto_fix.scan_declarations(content)]
+
+
+def test_declarations_across_lines_and_forms():
+    content = (
+        "export function first(a: string, b = { c: 1 }) {\n"
+        "  return a;\n"
+        "}\n"
+        "\n"
+        "/** Documented. */\n"
+        "export const second = async (\n"
+        "  x: number,\n"
+        "  { y }: Opts,\n"
+        ") => x;\n"
+        "export default function () {}\n"
+        "export type T = string;\n"
+        "export { first as alias };\n"
+        "export const value = 3;\n"
+        "export const one = v => v;\n"
+    )
+    assert names(content) == [
+        ("first", ["a", "b"], False),
+        ("second", ["x", "param1"], True),
+        ("default", [], False),
+        ("one", ["v"], False),
+    ]
+
+
+def test_braces_in_regex_literals_and_templates_do_not_change_depth():
+    # Read as code, each "{" would leave the indented export inside a block
+    content = (
+        "const open = /{/g;\n"
+        'const tpl = `{ ${"{"} ${ `{` } `;\n'
+        "  export function indented(a) {}\n"
+    )
+    assert names(content) == [("indented", ["a"], False)]
+
+
+def test_exports_inside_a_template_are_text():
+    content = (
+        "const doc = `\n"
+        "export function notReal() {}\n"
+        "`;\n"
+        "const tick = /`/;\n"
+        "export const real = () => 1;\n"
+    )
+    declarations = auto_fix.scan_declarations(content)
+    assert [d.name for d in declarations] == ["real"]
+    assert declarations[0].offset == content.index("export const real")
+
+
+def test_jsdoc_insertions_skip_documented_declarations():
+    content = "/** Kept. */\nexport function kept() {}\n  export function f(a) {}\n"
+    assert auto_fix.jsdoc_insertions(content) == [(
+        content.index("  export function f"),
+        "  /**\n   * f - TODO: Add description\n   * @param a - TODO: Add param description\n   */\n",
+    )]
+
+
+# ── EditSet ──────────────────────────────────────────────────────────────────
+
+BASE = "import a;\nconst x = 1;\nexport default x;\n"
+
+
+def edit(start, end, text, source="test"):
+    return auto_fix.Edit(start, end, text, source)
+
+
+def test_edits_apply_against_the_base_in_offset_order():
+    edits = auto_fix.EditSet()
+    at = BASE.index("const")
+    assert edits.add("a.ts", BASE, edit(at, at + 5, "let", "rename"))
+    assert edits.add("a.ts", BASE, edit(0, 0, '"use client";\n\n', "directive"))
+    assert edits.add("a.ts", BASE, edit(len(BASE), len(BASE), "// end\n", "footer"))
+    assert edits.content("a.ts") == '"use client";\n\nimport a;\nlet x = 1;\nexport default x;\n// end\n'
+    assert edits.base("a.ts") == BASE
+
+
+def test_identical_edits_apply_once_and_insertions_keep_arrival_order():
+    edits = auto_fix.EditSet()
+    assert edits.add("a.ts", BASE, edit(0, 0, "// one\n", "first"))
+    assert edits.add("a.ts", BASE, edit(0, 0, "// one\n", "again"))
+    assert edits.add("a.ts", BASE, edit(0, 0, "// two\n", "second"))
+    assert edits.content("a.ts") == "// one\n// two\n" + BASE
+    assert not edits.conflicts
+
+
+def test_overlapping_edits_conflict_and_the_first_is_kept():
+    edits = auto_fix.EditSet()
+    first = edit(0, 6, "export", "first")
+    assert edits.add("a.ts", BASE, first)
+    second = edit(3, 9, "ort b", "second")
+    assert not edits.add("a.ts", BASE, second)
+    inside = edit(2, 2, "!", "insert")
+    assert not edits.add("a.ts", BASE, inside)  # an insertion strictly inside a replacement
+    assert edits.add("a.ts", BASE, edit(6, 6, " *", "adjacent"))  # touching is not overlapping
+    assert edits.conflicts == [("a.ts", second, first), ("a.ts", inside, first)]
+    assert edits.content("a.ts") == "export * a;\n" + BASE[len("import a;\n"):]
+
+
+def test_edits_outside_the_file_are_rejected():
+    edits = auto_fix.EditSet()
+    with pytest.raises(ValueError):
+        edits.add("a.ts", BASE, edit(0, len(BASE) + 1, ""))
+
+
+def test_snapshots_replay_and_merge_into_a_shared_set():
+    one, two = auto_fix.EditSet(), auto_fix.EditSet()
+    one.add("a.ts", BASE, edit(0, 0, "// one\n", "one"))
+    two.add("a.ts", BASE, edit(len(BASE), len(BASE), "// two\n", "two"))
+    two.add("new.ts", None, edit(0, 0, "export {};\n", "two"))
+
+    shared = auto_fix.EditSet()
+    assert shared.replay(one.snapshot())
+    assert shared.accepts("a.ts", *two.snapshot()["a.ts"])
+    assert shared.replay(two.snapshot())
+    assert shared.merged() == {"a.ts": "// one\n" + BASE + "// two\n", "new.ts": "export {};\n"}
+
+
+def test_accepts_refuses_overlaps_and_a_different_base():
+    shared = auto_fix.EditSet()
+    shared.add("a.ts", BASE, edit(0, 6, "export", "one"))
+    assert not shared.accepts("a.ts", BASE, [edit(4, 8, "x", "two")])
+    assert not shared.accepts("a.ts", "// edited\n" + BASE, [edit(0, 0, "x", "two")])
+    assert shared.accepts("a.ts", BASE, [edit(0, 6, "export", "two")])  # the same change
+    assert shared.accepts("b.ts", BASE, [edit(4, 8, "x", "two")])
+    assert not shared.replay({"a.ts": (BASE, (edit(5, 7, "y", "three"),))})
+
+
+# ── group_fixes ──────────────────────────────────────────────────────────────
+
+def fix(number, category="missing_type", base="base1", files=None, edits=None, commit=True):
+    """An (issue, category, spec) result as drain_fixes() collects them."""
+    issue = auto_fix.IssueSnapshot(number, f"Issue {number}", "")
+    files = {path: ("100644", blob) for path, blob in (files or {}).items()}
+    spec = auto_fix.PullRequestSpec(
+        f"auto-fix-{number}", f"Fix #{number}", "", [], number,
+        auto_fix.FixCommit(f"sha{number}", base, files, edits) if commit else None,
+    )
+    return issue, category, spec
+
+
+def groups(*fixes):
+    return [[issue.number for issue, _ in members] for members in auto_fix.group_fixes(fixes)]
+
+
+def snapshot(*edits):
+    """A one-file EditSet snapshot for a.ts with `edits` against BASE."""
+    return {"a.ts": (BASE, tuple(edits))}
+
+
+def test_same_handler_and_base_share_a_group():
+    assert groups(
+        fix(1, files={"a.ts": "blob-a"}),
+        fix(2, "accessibility", files={"b.ts": "blob-b"}),  # also fix_generic_improvement
+        fix(3, "documentation", files={"c.ts": "blob-c"}),
+        fix(4, base="base2", files={"d.ts": "blob-d"}),
+        fix(5, commit=False),
+    ) == [[1, 2], [3], [4], [5]]
+
+
+def test_same_path_is_shared_only_when_it_ends_up_identical_or_merges():
+    directive = edit(0, 0, '"use client";\n\n', "directive")
+    assert groups(
+        fix(1, files={"a.ts": "with-directive"}, edits=snapshot(directive)),
+        fix(2, files={"a.ts": "with-directive"}, edits=snapshot(directive)),
+    ) == [[1, 2]]
+    assert groups(
+        fix(1, files={"a.ts": "head"}, edits=snapshot(edit(0, 0, "// one\n", "one"))),
+        fix(2, files={"a.ts": "tail"}, edits=snapshot(edit(len(BASE), len(BASE), "// two\n", "two"))),
+    ) == [[1, 2]]
+    assert groups(
+        fix(1, files={"a.ts": "head"}, edits=snapshot(edit(0, 6, "export", "one"))),
+        fix(2, files={"a.ts": "other"}, edits=snapshot(edit(3, 9, "ort b", "two"))),
+    ) == [[1], [2]]
+    assert groups(
+        fix(1, files={"a.ts": "head"}),
+        fix(2, files={"a.ts": "other"}),  # different contents and no edits to merge
+    ) == [[1], [2]]
+
+
+def test_later_fixes_are_checked_against_every_edit_in_the_group():
+    at = BASE.index("const")
+    assert groups(
+        fix(1, files={"a.ts": "v1"}, edits=snapshot(edit(0, 6, "export", "one"))),
+        fix(2, files={"a.ts": "v2"}, edits=snapshot(edit(at, at + 5, "let", "two"))),
+        # Fine against fix 2's file alone, but overlaps what fix 1 changed
+        fix(3, files={"a.ts": "v3"}, edits=snapshot(edit(2, 4, "x", "three"))),
+    ) == [[1, 2], [3]]
+
+
+def test_groups_are_capped_at_max_group_size(monkeypatch):
+    monkeypatch.setattr(auto_fix, "MAX_GROUP_SIZE", 2)
+    assert groups(*(fix(n, files={f"{n}.ts": "blob"}) for n in range(1, 6))) == [[1, 2], [3, 4], [5]]
+
+
+# ── Ledger.backoff ───────────────────────────────────────────────────────────
+
+HOUR = 3600
+
+
+def issue(updated_at="2026-01-01T00:00:00Z", number=7):
+    return auto_fix.IssueRecord(number, "Broken thing", "", ["bug"], updated_at)
+
+
+@pytest.fixture
+def ledger(monkeypatch):
+    monkeypatch.setattr(auto_fix, "BACKOFF_HOURS", 24)
+    monkeypatch.setattr(auto_fix, "BACKOFF_MAX_DAYS", 3)
+    return auto_fix.Ledger(path="", repo="owner/repo")
+
+
+def left_hours(ledger, issue, hours_later=0):
+    backoff = ledger.backoff(issue, now=auto_fix.time.time() + hours_later * HOUR)
+    return backoff and (backoff[0], round(backoff[1] / HOUR))
+
+
+def test_backoff_doubles_per_miss_up_to_the_cap(ledger):
+    assert ledger.backoff(issue()) is None
+    expected = [(1, 24), (2, 48), (3, 72), (4, 72)]  # 96h capped at BACKOFF_MAX_DAYS
+    for misses, hours in expected:
+        ledger.record(issue(), "missing_type", "no_fix" if misses % 2 else "failed", 1.0)
+        assert left_hours(ledger, issue()) == (misses, hours)
+    assert ledger.stats["backed_off"] == len(expected)
+
+
+def test_backoff_ends_within_the_grace_period(ledger):
+    ledger.record(issue(), "missing_type", "no_fix", 1.0)
+    assert left_hours(ledger, issue(), hours_later=22) == (1, 2)
+    assert ledger.backoff(issue(), now=auto_fix.time.time() + 24 * HOUR - auto_fix.BACKOFF_GRACE) is None
+
+
+def test_an_edited_issue_or_a_fix_clears_the_backoff(ledger):
+    ledger.record(issue(), "missing_type", "no_fix", 1.0)
+    assert ledger.backoff(issue(updated_at="2026-01-02T00:00:00Z")) is None
+    ledger.record(issue(updated_at="2026-01-02T00:00:00Z"), "missing_type", "no_fix", 1.0)
+    assert left_hours(ledger, issue(updated_at="2026-01-02T00:00:00Z")) == (1, 24)  # misses start over
+    ledger.record(issue(updated_at="2026-01-02T00:00:00Z"), "missing_type", "fixed", 1.0)
+    assert ledger.backoff(issue(updated_at="2026-01-02T00:00:00Z")) is None
+    assert ledger.backoff(issue(number=8)) is None
+
+
+def test_a_timeout_neither_backs_off_nor_forgets_misses(ledger):
+    ledger.record(issue(), "missing_type", "no_fix", 1.0)
+    ledger.record(issue(), "missing_type", "timeout", 1.0)
+    assert ledger.backoff(issue()) is None
+    ledger.record(issue(), "missing_type", "no_fix", 1.0)
+    assert left_hours(ledger, issue()) == (2, 48)
@@ -1,9 +1,49 @@
 """
 PostHog Analytics Test Utility
 
-Run this in your browser console to test if analytics are working.
+    python test-posthog.py [guide]      setup guide and browser-console checks
+    python test-posthog.py sample -n 5  print synthetic events as JSON lines
+    python test-posthog.py load --events 20000 --batch-size 50 --gzip
+    python test-posthog.py serve [--port 8010] [--latency 20] [--error-rate 0.01]
+    python test-posthog.py dump [--log .posthog-stub/events.phlog]
+
+`load` is an offline load generator for the analytics capture path. It
+synthesises user sessions from the AnalyticsEvent types declared in
+lib/analytics.ts (read from that file, so new events are picked up),
+sends them to a PostHog-compatible endpoint (/capture/, /batch/ or /e/)
+with the chosen batching, concurrency and compression, and reports
+events/sec and p50/p95/p99 request latency. It only talks to --host,
+which defaults to a local stub rather than PostHog itself.
+
+`serve` is that stub: an asyncio server accepting the same three
+endpoints (plain or gzip), with optional artificial latency and error
+rate. Events are appended to a compact column-oriented log (see
+ColumnLog; `dump` reads it back) and GET /stats reports ingest rate,
+queue depth and bytes written, so batching changes can be compared
+from the server side too.
 """
 
+import argparse
+import asyncio
+import base64
+import gzip
+import json
+import os
+import random
+import re
+import statistics
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs
+
 # Step 1: Check PostHog Configuration
 def check_posthog_config():
     """Check if PostHog is properly configured"""
@@ -226,8 +266,312 @@ def sample_queries():
     ══════════════════════════════════════════════════════════
     """)
 
-# Main execution
-if __name__ == "__main__":
+# Step 5: Load Test the Capture Path
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib", "analytics.ts")
+DEFAULT_HOST = "http://127.0.0.1:8010"
+ENDPOINTS = {"capture": "/capture/", "batch": "/batch/", "e": "/e/"}
+
+SCHEMA_BLOCK_RE = re.compile(r"export type AnalyticsEvent = \{(.*?)\n\}", re.S)
+SCHEMA_EVENT_RE = re.compile(r"^\s*'(\w+)':\s*\{(.*?)^\s*\}", re.M | re.S)
+SCHEMA_FIELD_RE = re.compile(r"^\s*(\w+)(\?)?:\s*(.+?)\s*$", re.M)
+
+QUERIES = [
+    "best cities for remote work in europe", "tokyo cost of living", "lisbon vs porto for startups",
+    "vector databases compared", "quiet neighbourhoods in berlin", "safest cities in south america",
+    "coworking spaces in bangalore", "visa requirements for digital nomads", "top universities for ai",
+]
+MODELS = ["gemini-flash", "gemini-pro", "gpt-4o-mini", "claude-haiku", "llama-3-70b"]
+PAGES = ["/", "/research", "/history", "/settings", "/extended"]
+API_PATHS = ["/api/research", "/api/research/extended", "/api/search-history", "/api/vector-store"]
+
+
+def short_id(rng, length=16):
+    return uuid.UUID(int=rng.getrandbits(128)).hex[:length]
+
+
+# Realistic values for fields the schema declares, by name; anything else falls back to its type
+FIELD_VALUES = {
+    "query": lambda r: r.choice(QUERIES),
+    "model": lambda r: r.choice(MODELS),
+    "previousModel": lambda r: r.choice(MODELS),
+    "newModel": lambda r: r.choice(MODELS),
+    "duration": lambda r: int(r.lognormvariate(7.8, 0.6)),  # ms, median ~2.4s
+    "loadTime": lambda r: int(r.lognormvariate(6.5, 0.5)),
+    "criteriaCount": lambda r: r.randint(1, 8),
+    "resultsCount": lambda r: r.randint(0, 20),
+    "outputLength": lambda r: r.randint(300, 12000),
+    "outputCharacters": lambda r: r.randint(300, 12000),
+    "tokensEstimate": lambda r: r.randint(100, 4000),
+    "selectedIds": lambda r: r.randint(1, 10),
+    "enrichedCount": lambda r: r.randint(1, 10),
+    "operation": lambda r: r.choice(["research", "extended_research", "summarise"]),
+    "cachedJobId": short_id,
+    "searchId": short_id,
+    "method": lambda r: r.choice(["google", "github", "email"]),
+    "endpoint": lambda r: r.choice(API_PATHS),
+    "page": lambda r: r.choice(PAGES),
+    "statusCode": lambda r: r.choice([400, 429, 500, 502, 504]),
+    "errorMessage": lambda r: r.choice(["Request timed out", "Rate limited", "Upstream error"]),
+    "error": lambda r: r.choice(["Request timed out", "Rate limited", "Model overloaded"]),
+    "component": lambda r: r.choice(["ResearchForm", "ResultsTable", "HistoryList"]),
+    "criteriaName": lambda r: r.choice(["walkability", "nightlife", "internet speed", "rent"]),
+    "criteriaType": lambda r: r.choice(["number", "rating", "boolean"]),
+    "documentType": lambda r: r.choice(["pdf", "markdown", "webpage"]),
+    "settings": lambda r: {"temperature": round(r.uniform(0, 1), 2), "maxTokens": r.choice([1024, 2048, 4096])},
+}
+
+
+def load_schema(path=SCHEMA_PATH):
+    """{event name: {field: (type, optional)}} from the AnalyticsEvent type in lib/analytics.ts"""
+    with open(path, "r") as f:
+        block = SCHEMA_BLOCK_RE.search(f.read())
+    if not block:
+        sys.exit(f"❌ No `export type AnalyticsEvent` in {path}")
+    return {
+        name: {field: (ts_type, bool(optional)) for field, optional, ts_type in SCHEMA_FIELD_RE.findall(body)}
+        for name, body in SCHEMA_EVENT_RE.findall(block.group(1))
+    }
+
+
+def field_value(rng, field, ts_type):
+    if field in FIELD_VALUES:
+        return FIELD_VALUES[field](rng)
+    if ts_type == "number":
+        return rng.randint(0, 1000)
+    if ts_type == "boolean":
+        return rng.random() < 0.9
+    if ts_type.startswith("Record"):
+        return {}
+    return short_id(rng, 12)
+
+
+class EventStream:
+    """
+    Interleaved user sessions emitting AnalyticsEvent properties.
+
+    A session signs in, loads a page and runs a few researches: initiated,
+    then either a cache hit or model usage plus completed/failed, sometimes
+    followed by extended research, a vector search or a settings change.
+    Required fields are always filled and optional ones most of the time;
+    fields that belong together (query, model, duration) stay consistent
+    within one research. Events the schema does not declare are skipped.
+    """
+
+    def __init__(self, schema, users=200, seed=None, open_sessions=50):
+        self.schema = schema
+        self.rng = random.Random(seed)
+        self.users = [f"user_{short_id(self.rng, 10)}" for _ in range(users)]
+        self.open_sessions = open_sessions
+        self.clock = datetime.now(timezone.utc)
+
+    def event(self, name, user, **known):
+        fields = self.schema.get(name)
+        if fields is None:
+            return None
+        properties = {}
+        for field, (ts_type, optional) in fields.items():
+            if field in known:
+                properties[field] = known[field]
+            elif not optional or self.rng.random() < 0.7:
+                properties[field] = field_value(self.rng, field, ts_type)
+        properties["userId"] = user
+        return name, properties
+
+    def session(self, user):
+        r = self.rng
+        if r.random() < 0.3:
+            yield self.event("user_signed_in", user)
+        yield self.event("page_load", user, page="/")
+        for _ in range(r.randint(1, 4)):
+            query, model = r.choice(QUERIES), r.choice(MODELS)
+            yield self.event("research_initiated", user, query=query, model=model)
+            if r.random() < 0.25:
+                yield self.event("research_cache_hit", user, query=query)
+                continue
+            duration = FIELD_VALUES["duration"](r)
+            yield self.event("api_response_time", user, endpoint="/api/research", duration=duration)
+            yield self.event("model_usage_tracked", user, model=model, duration=duration, operation="research")
+            if r.random() < 0.06:
+                yield self.event("research_failed", user, query=query, model=model)
+                yield self.event("api_error", user, endpoint="/api/research")
+                continue
+            yield self.event("research_completed", user, query=query, model=model, duration=duration)
+            if r.random() < 0.2:
+                yield self.event("extended_research_started", user, query=query)
+                cached = r.random() < 0.3
+                yield self.event(f"extended_research_{'cache_hit' if cached else 'completed'}", user, query=query)
+            if r.random() < 0.15:
+                yield self.event("vector_store_search", user, query=query)
+            if r.random() < 0.1:
+                yield self.event("custom_criteria_added", user)
+            if r.random() < 0.05:
+                yield self.event("model_changed", user, previousModel=model)
+        if r.random() < 0.3:
+            yield self.event("search_history_viewed", user)
+            yield self.event("search_history_item_viewed", user)
+        if r.random() < 0.1:
+            yield self.event("user_signed_out", user)
+
+    def __iter__(self):
+        """Endless (event, properties, timestamp), sessions interleaved on a simulated clock"""
+        sessions = [self.session(self.rng.choice(self.users)) for _ in range(self.open_sessions)]
+        while True:
+            i = self.rng.randrange(len(sessions))
+            item = next(sessions[i], StopIteration)
+            if item is StopIteration:
+                sessions[i] = self.session(self.rng.choice(self.users))
+                continue
+            if item is None:
+                continue
+            self.clock += timedelta(milliseconds=self.rng.expovariate(1 / 40))
+            yield item + (self.clock.isoformat().replace("+00:00", "Z"),)
+
+
+def posthog_event(name, properties, timestamp, api_key, endpoint):
+    """One event enriched like track() and laid out like trackServerEvent()"""
+    properties = dict(properties, timestamp=timestamp, environment="loadtest",
+                      distinct_id=properties["userId"], **{"$lib": "test-posthog"})
+    if endpoint == "e":
+        properties["token"] = api_key
+    return {"event": name, "properties": properties, "timestamp": timestamp, "uuid": str(uuid.uuid4())}
+
+
+def build_requests(events, endpoint, batch_size, api_key, compress):
+    """(path, body, headers, event count, uncompressed size) per request"""
+    path = ENDPOINTS[endpoint] + ("?compression=gzip-js" if compress else "")
+    built = []
+    for start in range(0, len(events), batch_size):
+        chunk = [posthog_event(*event, api_key, endpoint) for event in events[start:start + batch_size]]
+        if endpoint == "capture":
+            payload = dict(chunk[0], api_key=api_key)
+        elif endpoint == "batch":
+            payload = {"api_key": api_key, "batch": chunk}
+        else:
+            payload = chunk
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        headers = {"Content-Type": "application/json"}
+        raw = len(body)
+        if compress:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        built.append((path, body, headers, len(chunk), raw))
+    return built
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+def run_load(args):
+    """Send args.events synthetic events to args.host and report throughput and latency"""
+    import requests  # only the load test needs it
+
+    schema = load_schema(args.schema)
+    batch_size = 1 if args.endpoint == "capture" else max(1, args.batch_size)
+    if args.endpoint == "capture" and args.batch_size != 1 and not args.json:
+        print("ℹ️  /capture/ takes one event per request; ignoring --batch-size")
+
+    # Bodies are built up front so the timed part is only the HTTP traffic
+    started = time.perf_counter()
+    stream = iter(EventStream(schema, users=args.users, seed=args.seed))
+    events = [next(stream) for _ in range(args.events)]
+    batches = build_requests(events, args.endpoint, batch_size, args.api_key, args.gzip)
+    if not args.json:
+        print(f"🧪 Prepared {len(events):,} events ({len({e[0] for e in events})} of {len(schema)} event types) "
+              f"in {len(batches):,} requests ({time.perf_counter() - started:.2f}s)")
+
+    host = args.host.rstrip("/")
+    local = threading.local()
+
+    def send(request):
+        path, body, headers, count, _ = request
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        t0 = time.perf_counter()
+        try:
+            status = session.post(host + path, data=body, headers=headers, timeout=args.timeout).status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        return time.perf_counter() - t0, status, count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(send, batches))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(r[0] for r in results)
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    delivered = sum(count for _, status, count in results if isinstance(status, int) and status < 300)
+    ms = lambda seconds: round(seconds * 1000, 2)
+    report = {
+        "endpoint": host + ENDPOINTS[args.endpoint],
+        "events": len(events),
+        "delivered": delivered,
+        "requests": len(batches),
+        "batch_size": batch_size,
+        "concurrency": args.concurrency,
+        "gzip": args.gzip,
+        "seconds": round(elapsed, 3),
+        "events_per_sec": round(delivered / elapsed, 1) if elapsed else 0.0,
+        "requests_per_sec": round(len(batches) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "mean": ms(statistics.fmean(latencies)) if latencies else 0.0,
+            "max": ms(latencies[-1]) if latencies else 0.0,
+        },
+        "statuses": statuses,
+        "bytes_sent": sum(len(b[1]) for b in batches),
+        "bytes_uncompressed": sum(b[4] for b in batches),
+    }
+
+    try:
+        report["server"] = requests.get(host + "/stats", timeout=2).json()
+    except (requests.RequestException, ValueError):
+        pass  # not the local stub
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        lat = report["latency_ms"]
+        print(f"""
+    ══════════════════════════════════════════════════════════
+    📈 LOAD TEST: {report['endpoint']}
+    ══════════════════════════════════════════════════════════
+    batch {batch_size}, concurrency {args.concurrency}, gzip {'on' if args.gzip else 'off'}
+
+    Delivered:   {delivered:,} / {len(events):,} events in {elapsed:.2f}s
+    Throughput:  {report['events_per_sec']:,.0f} events/sec, {report['requests_per_sec']:,.0f} requests/sec
+    Latency:     p50 {lat['p50']}ms, p95 {lat['p95']}ms, p99 {lat['p99']}ms, max {lat['max']}ms
+    Responses:   {', '.join(f'{k}: {v}' for k, v in sorted(statuses.items()))}
+    Sent:        {report['bytes_sent'] / 1e6:.2f} MB ({report['bytes_uncompressed'] / 1e6:.2f} MB uncompressed)
+    {server_line(report.get('server'))}══════════════════════════════════════════════════════════
+    """)
+    return 0 if delivered == len(events) else 1
+
+
+def server_line(server):
+    if not server:
+        return ""
+    return (f"Stub:        {server['events_written']:,} events written, {server['bytes_written'] / 1e6:.2f} MB on disk, "
+            f"queue {server['queue_depth']}, {server['ingest_rate']:,.0f} events/sec (10s)\n    ")
+
+
+def print_samples(args):
+    """Print synthetic events as JSON lines without sending them"""
+    stream = iter(EventStream(load_schema(args.schema), users=args.users, seed=args.seed))
+    for _ in range(args.count):
+        name, properties, timestamp = next(stream)
+        print(json.dumps({"event": name, "properties": properties, "timestamp": timestamp}))
+
+
+def print_guide():
     print("""
     ╔══════════════════════════════════════════════════════════╗
     ║                                                          ║
@@ -265,3 +609,458 @@ if __name__ == "__main__":
     
     ══════════════════════════════════════════════════════════
     """)
+
+# Step 6: Local Capture Stub
+DEFAULT_LOG = ".posthog-stub/events.phlog"
+LOG_MAGIC = b"PHLB"
+LOG_FRAME = struct.Struct("<4sIII")  # magic, header length, body length, crc32 of header + body
+MAX_TIMESTAMP_MS = int(datetime(9999, 12, 31, tzinfo=timezone.utc).timestamp() * 1000)
+compact_json = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def block_columns(events):
+    """
+    Split events into named columns: timestamps as ms deltas, event
+    and distinct_id dictionary-encoded (each dictionary as JSON strings,
+    one per line), uuids as 16 raw bytes, and one column per property key
+    (JSON values, one per line, empty if absent).
+    """
+    names, name_ids = [], {}
+    users, user_ids = [], {}
+    event_col, user_col, ts_col = array("I"), array("I"), array("q")
+    uuids = bytearray()
+    keys = {}
+    previous = 0
+    for i, event in enumerate(events):
+        name = str(event.get("event", ""))
+        if name not in name_ids:
+            name_ids[name] = len(names)
+            names.append(name)
+        event_col.append(name_ids[name])
+        user = str(event.get("distinct_id", ""))
+        if user not in user_ids:
+            user_ids[user] = len(users)
+            users.append(user)
+        user_col.append(user_ids[user])
+        ts = event.get("timestamp_ms", 0)
+        ts_col.append(ts - previous)
+        previous = ts
+        try:
+            uuids += uuid.UUID(str(event.get("uuid"))).bytes
+        except ValueError:
+            uuids += bytes(16)
+        for key, value in event.get("properties", {}).items():
+            if key not in keys:
+                keys[key] = [""] * len(events)
+            keys[key][i] = compact_json(value)
+    columns = {
+        "event.dict": "\n".join(map(compact_json, names)).encode(),
+        "event": event_col.tobytes(),
+        "distinct_id.dict": "\n".join(map(compact_json, users)).encode(),
+        "distinct_id": user_col.tobytes(),
+        "timestamp": ts_col.tobytes(),
+        "uuid": bytes(uuids),
+    }
+    for key, values in keys.items():
+        columns[f"p.{key}"] = "\n".join(values).encode()
+    return columns
+
+
+class ColumnLog:
+    """
+    Append-only event log made of self-contained column blocks.
+
+    Each block is LOG_FRAME followed by a JSON header (row count and
+    column lengths) and the zlib-compressed columns back to back. A
+    crc32 covers header and body, so a block torn by a crash is detected
+    and cut off when the log is reopened; everything before it is intact.
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        valid_end = sum(size for _, size in self.blocks(path))
+        with open(path, "ab") as f:
+            torn = f.tell() - valid_end
+            if torn:
+                print(f"⚠️  Dropping {torn} bytes of a torn block at the end of {path}")
+                f.truncate(valid_end)
+        self.file = open(path, "ab")
+        self.bytes_written = valid_end
+        self.blocks_written = 0
+
+    def append(self, events):
+        """Encode events as one block and append it; returns bytes written"""
+        columns = {name: zlib.compress(data, 6) for name, data in block_columns(events).items()}
+        header = json.dumps({"rows": len(events), "columns": [[name, len(data)] for name, data in columns.items()]},
+                            separators=(",", ":")).encode()
+        body = b"".join(columns.values())
+        frame = LOG_FRAME.pack(LOG_MAGIC, len(header), len(body), zlib.crc32(body, zlib.crc32(header)))
+        try:
+            self.file.write(frame + header + body)
+            self.file.flush()
+            if self.fsync:
+                os.fsync(self.file.fileno())
+        except OSError:
+            self.file.truncate(self.bytes_written)  # no half block for later ones to land behind
+            raise
+        size = LOG_FRAME.size + len(header) + len(body)
+        self.bytes_written += size
+        self.blocks_written += 1
+        return size
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def blocks(path):
+        """(header, columns) and block size for every intact block, stopping at the first bad one"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            while True:
+                frame = f.read(LOG_FRAME.size)
+                if len(frame) < LOG_FRAME.size:
+                    return
+                magic, header_len, body_len, crc = LOG_FRAME.unpack(frame)
+                header, body = f.read(header_len), f.read(body_len)
+                if (magic != LOG_MAGIC or len(header) < header_len or len(body) < body_len
+                        or zlib.crc32(body, zlib.crc32(header)) != crc):
+                    return
+                header = json.loads(header)
+                columns, offset = {}, 0
+                for name, length in header["columns"]:
+                    columns[name] = body[offset:offset + length]
+                    offset += length
+                yield (header, columns), LOG_FRAME.size + header_len + body_len
+
+    @staticmethod
+    def read(path):
+        """Decode every intact block back into event dicts"""
+        for (header, columns), _ in ColumnLog.blocks(path):
+            rows = header["rows"]
+            column = lambda name: zlib.decompress(columns[name])
+            names = [json.loads(line) for line in column("event.dict").decode().split("\n")]
+            users = [json.loads(line) for line in column("distinct_id.dict").decode().split("\n")]
+            event_col, user_col, ts_col = array("I"), array("I"), array("q")
+            event_col.frombytes(column("event"))
+            user_col.frombytes(column("distinct_id"))
+            ts_col.frombytes(column("timestamp"))
+            uuids = column("uuid")
+            properties = {name[2:]: column(name).decode().split("\n") for name in columns if name.startswith("p.")}
+            ts = 0
+            for i in range(rows):
+                ts += ts_col[i]
+                yield {
+                    "event": names[event_col[i]],
+                    "distinct_id": users[user_col[i]],
+                    "timestamp": datetime.fromtimestamp(ts / 1000, timezone.utc).isoformat().replace("+00:00", "Z"),
+                    "uuid": str(uuid.UUID(bytes=uuids[i * 16:i * 16 + 16])),
+                    "properties": {key: json.loads(values[i]) for key, values in properties.items() if values[i]},
+                }
+
+
+def parse_timestamp_ms(value):
+    """Epoch ms for an ISO or numeric timestamp (unparsable strings mean now); ValueError if out of range"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        ms = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            ms = time.time() * 1000
+        else:
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)  # PostHog reads naive times as UTC
+            ms = parsed.timestamp() * 1000
+    if not 0 <= ms <= MAX_TIMESTAMP_MS:  # also rejects NaN
+        raise ValueError(f"timestamp out of range: {value!r}")
+    return int(ms)
+
+
+def first_set(*values):
+    """The first value that is not None; unlike `or`, 0 and "" count"""
+    return next((value for value in values if value is not None), None)
+
+
+def capture_events(query, headers, body):
+    """Events and decoded size of a /capture/, /batch/ or /e/ body; ValueError is PostHog's 400"""
+    if headers.get("content-encoding") == "gzip" or "compression=gzip" in query:
+        body = gzip.decompress(body)
+    if headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+        form = parse_qs(body.decode())
+        if "data" in form:
+            body = base64.b64decode(form["data"][0])
+    payload = json.loads(body)
+    if isinstance(payload, dict) and "batch" in payload:
+        events, api_key = payload["batch"], payload.get("api_key")
+    elif isinstance(payload, dict):
+        events, api_key = [payload], payload.get("api_key")
+    else:
+        events, api_key = payload, None
+    if not isinstance(events, list) or not all(isinstance(e, dict) and e.get("event") for e in events):
+        raise ValueError("expected an event, a batch or a list of events")
+    for event in events:
+        if event.get("properties") is None:
+            event["properties"] = {}
+        if not isinstance(event["properties"], dict):
+            raise ValueError("properties must be an object")
+    api_key = api_key or next((e["properties"].get("token") for e in events), None)
+    if not api_key:
+        raise PermissionError("API key is missing")
+    for event in events:
+        properties = event["properties"]
+        event["distinct_id"] = first_set(event.get("distinct_id"), properties.get("distinct_id"), "")
+        event["timestamp_ms"] = parse_timestamp_ms(first_set(event.get("timestamp"), properties.get("timestamp"),
+                                                             time.time() * 1000))
+    return events, len(body)
+
+
+class CaptureStub:
+    """
+    asyncio server speaking enough of PostHog's capture API for load tests.
+
+    Handlers parse and enqueue each request's events; a single writer
+    drains the queue into ColumnLog blocks of up to --block-size events
+    (or whatever arrived within --flush-ms), encoding and writing off the
+    event loop. A full queue makes handlers wait, which shows up as
+    client latency the same way a backed-up ingestion pipeline would.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.log = ColumnLog(args.log, fsync=args.fsync)
+        self.queue = None
+        self.queued = 0  # events waiting for the writer
+        self.started = time.time()
+        self.window = deque()  # (second, events) for the rolling ingest rate
+        self.stats = {
+            "requests": {}, "responses": {}, "events_received": 0, "events_written": 0,
+            "events_dropped": 0, "bytes_received": 0, "bytes_decoded": 0, "injected_errors": 0,
+        }
+
+    def count(self, kind, key):
+        self.stats[kind][key] = self.stats[kind].get(key, 0) + 1
+
+    def ingest_rate(self):
+        now = int(time.time())
+        while self.window and self.window[0][0] < now - 10:
+            self.window.popleft()
+        span = max(1, now - self.window[0][0] + 1) if self.window else 1
+        return round(sum(n for _, n in self.window) / span, 1)
+
+    def snapshot(self):
+        uptime = time.time() - self.started
+        return dict(
+            self.stats,
+            uptime_seconds=round(uptime, 1),
+            ingest_rate=self.ingest_rate(),
+            ingest_rate_overall=round(self.stats["events_received"] / uptime, 1) if uptime else 0.0,
+            queue_depth=self.queued,
+            queue_requests=self.queue.qsize(),
+            blocks_written=self.log.blocks_written,
+            bytes_written=self.log.bytes_written,
+            compression_ratio=round(self.stats["bytes_decoded"] / self.log.bytes_written, 2)
+            if self.log.bytes_written else None,
+            log=os.path.abspath(self.args.log),
+            latency_ms=self.args.latency,
+            error_rate=self.args.error_rate,
+        )
+
+    async def writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batches = [await self.queue.get()]
+            events = list(batches[0])
+            deadline = loop.time() + self.args.flush_ms / 1000
+            while len(events) < self.args.block_size:
+                try:
+                    if self.queue.empty():
+                        batch = await asyncio.wait_for(self.queue.get(), deadline - loop.time())
+                    else:
+                        batch = self.queue.get_nowait()
+                except asyncio.TimeoutError:
+                    break
+                batches.append(batch)
+                events += batch
+            try:
+                await loop.run_in_executor(None, self.log.append, events)
+                self.stats["events_written"] += len(events)
+            except Exception as e:  # keep the only writer alive; later events must still land
+                self.stats["events_dropped"] += len(events)
+                print(f"❌ Dropped a block of {len(events)} events: {type(e).__name__}: {e}")
+            self.queued -= len(events)
+            for _ in batches:
+                self.queue.task_done()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 411: "Length Required",
+                  503: "Service Unavailable"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+        await writer.drain()
+        self.count("responses", str(status))
+
+    async def handle(self, method, target, headers, body):
+        path, _, query = target.partition("?")
+        route = path.rstrip("/")
+        if method == "GET" and route == "/stats":
+            return 200, self.snapshot()
+        if method != "POST" or route not in ("/capture", "/batch", "/e", "/track", "/i/v0/e"):
+            return 404, {"error": f"no route for {method} {path}"}
+        self.count("requests", route + "/")
+        self.stats["bytes_received"] += len(body)
+        if self.args.latency:
+            jitter = self.rng.uniform(-self.args.jitter, self.args.jitter)
+            await asyncio.sleep(max(0.0, self.args.latency + jitter) / 1000)
+        if self.rng.random() < self.args.error_rate:
+            self.stats["injected_errors"] += 1
+            return 503, {"error": "injected failure"}
+        try:
+            events, decoded = capture_events(query, headers, body)
+        except PermissionError as e:
+            return 401, {"type": "authentication_error", "detail": str(e)}
+        except (ValueError, KeyError, OSError, EOFError) as e:
+            return 400, {"type": "validation_error", "detail": str(e)[:200]}
+        self.stats["bytes_decoded"] += decoded
+        self.stats["events_received"] += len(events)
+        second = int(time.time())
+        if self.window and self.window[-1][0] == second:
+            self.window[-1] = (second, self.window[-1][1] + len(events))
+        else:
+            self.window.append((second, len(events)))
+        self.queued += len(events)
+        await self.queue.put(events)
+        return 200, {"status": 1}
+
+    async def connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and "1.1" in version
+                if method == "OPTIONS":
+                    await self.respond(writer, 200, {}, keep_alive)
+                    continue
+                if "chunked" in headers.get("transfer-encoding", ""):
+                    await self.respond(writer, 411, {"error": "send Content-Length"}, False)
+                    break
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self.handle(method, target, headers, body)
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self.queue = asyncio.Queue(maxsize=self.args.queue_size)
+        writer = asyncio.create_task(self.writer())
+        server = await asyncio.start_server(self.connection, self.args.bind, self.args.port, backlog=1024)
+        print(f"🦔 PostHog capture stub on http://{self.args.bind}:{self.args.port} "
+              f"(/capture/, /batch/, /e/; stats at /stats) writing {self.args.log}")
+        if self.args.latency or self.args.error_rate:
+            print(f"   latency {self.args.latency}±{self.args.jitter}ms, error rate {self.args.error_rate:.1%}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            try:
+                await asyncio.wait_for(self.queue.join(), 10)  # flush what was already acknowledged
+            except asyncio.TimeoutError:
+                print(f"⚠️  Gave up waiting for {self.queued} acknowledged events to be written")
+            writer.cancel()
+
+
+def run_stub(args):
+    """Run the capture stub until interrupted, then flush and print final stats"""
+    stub = CaptureStub(args)
+    try:
+        asyncio.run(stub.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.log.close()
+    print(json.dumps(stub.snapshot(), indent=2))
+    return 0
+
+
+def dump_log(args):
+    """Print the events in a stub log as JSON lines"""
+    for event in ColumnLog.read(args.log):
+        print(json.dumps(event))
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("guide", help="print the setup and verification guide (default)")
+
+    def add_stream_args(command):
+        command.add_argument("--schema", default=SCHEMA_PATH, help="file declaring `type AnalyticsEvent`")
+        command.add_argument("--users", type=int, default=200, help="distinct users in the stream")
+        command.add_argument("--seed", type=int, help="make the event stream reproducible")
+
+    sample = commands.add_parser("sample", help="print synthetic events as JSON lines")
+    sample.add_argument("-n", "--count", type=int, default=10)
+    add_stream_args(sample)
+
+    load = commands.add_parser("load", help="send synthetic events to a capture endpoint")
+    load.add_argument("--host", default=DEFAULT_HOST, help=f"capture host (default {DEFAULT_HOST})")
+    load.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="batch")
+    load.add_argument("--events", type=int, default=10000, help="events to send")
+    load.add_argument("--batch-size", type=int, default=50, help="events per request for batch and e")
+    load.add_argument("--concurrency", type=int, default=8, help="requests in flight")
+    load.add_argument("--gzip", action="store_true", help="gzip bodies like posthog-js (compression=gzip-js)")
+    load.add_argument("--api-key", default="phc_loadtest")
+    load.add_argument("--timeout", type=float, default=30.0, help="seconds per request")
+    load.add_argument("--json", action="store_true", help="print the report as JSON")
+    add_stream_args(load)
+
+    serve = commands.add_parser("serve", help="run a local PostHog-compatible capture stub")
+    serve.add_argument("--bind", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8010)
+    serve.add_argument("--log", default=DEFAULT_LOG, help=f"append-only event log (default {DEFAULT_LOG})")
+    serve.add_argument("--fsync", action="store_true", help="fsync after every block")
+    serve.add_argument("--latency", type=float, default=0.0, help="artificial latency per request, ms")
+    serve.add_argument("--jitter", type=float, default=0.0, help="± uniform jitter on --latency, ms")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    serve.add_argument("--queue-size", type=int, default=10000, help="requests buffered before handlers wait")
+    serve.add_argument("--block-size", type=int, default=5000, help="max events per log block")
+    serve.add_argument("--flush-ms", type=float, default=200.0, help="max wait to fill a block, ms")
+    serve.add_argument("--seed", type=int, help="make injected latency and errors reproducible")
+
+    dump = commands.add_parser("dump", help="print a stub log as JSON lines")
+    dump.add_argument("--log", default=DEFAULT_LOG)
+    return parser.parse_args(argv)
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "load":
+        sys.exit(run_load(args))
+    elif args.command == "serve":
+        sys.exit(run_stub(args))
+    elif args.command == "dump":
+        sys.exit(dump_log(args))
+    elif args.command == "sample":
+        print_samples(args)
+    else:
+        print_guide()
@@ -0,0 +1,86 @@
+"""Round-trip tests for the capture stub's ColumnLog (test-posthog.py)."""
+
+import importlib.util
+import os
+import sys
+import uuid
+
+spec = importlib.util.spec_from_file_location(
+    "test_posthog_cli", os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-posthog.py")
+)
+posthog = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = posthog
+spec.loader.exec_module(posthog)
+
+
+def capture(events):
+    body = posthog.json.dumps({"api_key": "phc_test", "batch": events}).encode()
+    return posthog.capture_events("", {"content-type": "application/json"}, body)[0]
+
+
+def write_and_read(tmp_path, *blocks):
+    path = str(tmp_path / "events.phlog")
+    log = posthog.ColumnLog(path)
+    for events in blocks:
+        log.append(events)
+    log.close()
+    return path, list(posthog.ColumnLog.read(path))
+
+
+def test_round_trip_keeps_every_column(tmp_path):
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    events = capture([
+        {"event": "research_initiated", "distinct_id": "user_1", "uuid": ids[0],
+         "timestamp": "2026-01-01T00:00:00Z", "properties": {"query": "tokyo", "criteriaCount": 3}},
+        {"event": "research_completed", "distinct_id": "user_2", "uuid": ids[1],
+         "timestamp": "2026-01-01T00:00:01.500Z", "properties": {"success": True, "settings": {"t": 0.5}}},
+        {"event": "research_initiated", "distinct_id": "user_1", "uuid": ids[2],
+         "timestamp": "2025-12-31T23:59:59Z", "properties": {}},
+    ])
+    _, rows = write_and_read(tmp_path, events)
+    assert [r["event"] for r in rows] == ["research_initiated", "research_completed", "research_initiated"]
+    assert [r["distinct_id"] for r in rows] == ["user_1", "user_2", "user_1"]
+    assert [r["uuid"] for r in rows] == ids
+    assert [r["timestamp"] for r in rows] == [
+        "2026-01-01T00:00:00Z", "2026-01-01T00:00:01.500000Z", "2025-12-31T23:59:59Z",
+    ]
+    assert rows[0]["properties"] == {"query": "tokyo", "criteriaCount": 3}
+    assert rows[1]["properties"] == {"success": True, "settings": {"t": 0.5}}
+    assert rows[2]["properties"] == {}
+
+
+def test_dictionary_entries_may_contain_newlines(tmp_path):
+    events = capture([
+        {"event": "a", "distinct_id": "u\n1"},
+        {"event": "b\nc", "distinct_id": "u2"},
+        {"event": "a", "distinct_id": "u2"},
+    ])
+    _, rows = write_and_read(tmp_path, events)
+    assert [(r["event"], r["distinct_id"]) for r in rows] == [("a", "u\n1"), ("b\nc", "u2"), ("a", "u2")]
+
+
+def test_blocks_append_and_torn_tail_is_dropped(tmp_path):
+    first = capture([{"event": "a", "distinct_id": "u1"}])
+    second = capture([{"event": "b", "distinct_id": "u2"}, {"event": "c", "distinct_id": "u3"}])
+    path, rows = write_and_read(tmp_path, first, second)
+    assert [r["event"] for r in rows] == ["a", "b", "c"]
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 5)
+    assert [r["event"] for r in posthog.ColumnLog.read(path)] == ["a"]
+    log = posthog.ColumnLog(path)  # reopening cuts the torn block off, then appends after "a"
+    log.append(capture([{"event": "d", "distinct_id": "u4"}]))
+    log.close()
+    assert [r["event"] for r in posthog.ColumnLog.read(path)] == ["a", "d"]
+
+
+def test_naive_timestamps_are_utc_and_falsy_fields_are_kept(tmp_path):
+    events = capture([
+        {"event": "a", "distinct_id": 0, "timestamp": "2026-01-01T12:00:00"},
+        {"event": "b", "distinct_id": "", "properties": {"distinct_id": "from_properties"}, "timestamp": 0},
+        {"event": "c", "properties": {"distinct_id": "from_properties", "timestamp": "2026-01-01T12:00:00+02:00"}},
+    ])
+    assert [e["timestamp_ms"] for e in events] == [1767268800000, 0, 1767261600000]
+    _, rows = write_and_read(tmp_path, events)
+    assert [r["distinct_id"] for r in rows] == ["0", "", "from_properties"]
+    assert rows[0]["timestamp"] == "2026-01-01T12:00:00Z"